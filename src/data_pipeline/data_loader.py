@@ -2,51 +2,78 @@
 import pandas as pd
 import os
 from typing import List, Optional
-from .fetch_data import download_data
+from .fetch_data import download_all
+from .file_io import read_frame, write_frame
 
 def load_data(file_path_tickers:str, start_date:str, end_date:str, save_path:str):
     """
-    loads stock data from yfinace and saves it to a csv file:
-    if the file already exists, emptys the file and downloads the data again. 
-    centralized caller for the download_data function. 
+    loads stock data from yfinace and saves it to a csv or parquet file:
+    if the file already exists, only the days after each ticker's last saved date are
+    downloaded and appended to it. tickers that are already up to date are not requested.
+    (data before a ticker's first saved date is not backfilled.)
+    centralized caller for the download_all function, the new data is written
+    to the file once.
 
     file_path_tickers: str, the path to the txt file that contains the tickers to load
     start_date: str, the start date to load data from
     end_date: str, the end date to load data to
-    save_path: str, the path to the csv file to save the data to
+    save_path: str, the path to the .csv or .parquet file to save the data to
 
     returns:
-    pd.DataFrame, the loaded data
+    pd.DataFrame, the loaded data, both previously saved and newly downloaded
     """
 
     
-    try: 
-        with open(file_path_tickers, 'r') as file:  #open the file and read tickers
-            tickers = []
-            for line in file:
-                ticker = line.strip() 
-                if ticker:
-                    tickers.append(ticker)
-        if tickers == []:
-            print(f"Warning: Ticker file is empty or dosen't have readable characters: {file_path_tickers}")
-            return None
-    except FileNotFoundError:
+    if not os.path.isfile(file_path_tickers):
         print(f"Error: Ticker file not found at {file_path_tickers}")
         return None
 
-    all_downloaded_data = [] #list to hold all downloaded data
-    
-    for ticker in tickers: #go through all tickers 
-        print(f"--- Downloading data for {ticker} ---")
-        downloaded_df = download_data(ticker, start_date, end_date, save_path) #just download data
-        if downloaded_df is not None: 
-            all_downloaded_data.append(downloaded_df) 
+    try:
+        # one ticker per line. keep_default_na=False so real tickers like "NA" aren't read as missing
+        tickers = pd.read_csv(file_path_tickers, header=None, names=['Ticker'], dtype='string',
+                              keep_default_na=False)['Ticker']
+        tickers = tickers.str.strip().loc[lambda t: t != ''].unique().tolist()
+    except pd.errors.EmptyDataError:
+        tickers = []
+    if tickers == []:
+        print(f"Warning: Ticker file is empty or dosen't have readable characters: {file_path_tickers}")
+        return None
+
+    existing_df = None
+    last_dates = {} #last saved date for each ticker
+    if os.path.exists(save_path): #read the saved data once to know what is already downloaded
+        existing_df = read_frame(save_path)
+        last_dates = existing_df.groupby('Ticker')['Date'].max().to_dict()
+
+    # group tickers by the first date they still need, so each group can be downloaded in batches
+    tickers_by_start = {}
+    for ticker in tickers:
+        last_date = last_dates.get(ticker)
+        ticker_start = pd.Timestamp(start_date)
+        if last_date is not None:
+            ticker_start = max(ticker_start, last_date + pd.Timedelta(days=1))
+        # skip tickers that already cover the window. end_date is exclusive and markets are closed on
+        # weekends, so there is only something to download if a business day is left before it
+        if len(pd.bdate_range(ticker_start, pd.Timestamp(end_date) - pd.Timedelta(days=1))) > 0:
+            tickers_by_start.setdefault(ticker_start, []).append(ticker)
 
-    if not all_downloaded_data:
+    if not tickers_by_start:
+        print("All tickers are already up to date, nothing to download.")
+        return existing_df
+
+    downloaded = []
+    for ticker_start, group in tickers_by_start.items():
+        new_df = download_all(group, ticker_start.strftime('%Y-%m-%d'), end_date) #batched, concurrent download
+        if new_df is not None:
+            downloaded.append(new_df)
+
+    if not downloaded:
         print("No data was downloaded for any tickers.")
-        return None
- 
-    final_df = pd.concat(all_downloaded_data, ignore_index=True)
+        return existing_df
+
+    new_df = pd.concat(downloaded, ignore_index=True)
+    final_df = new_df if existing_df is None else pd.concat([existing_df, new_df], ignore_index=True)
+    write_frame(new_df, save_path, append=existing_df is not None) #single write for all new rows
     
     print("\nBatch download complete.")
     print(f"All data saved in: {save_path}")
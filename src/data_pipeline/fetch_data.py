@@ -1,17 +1,38 @@
 import yfinance as yf
 import os
 import pandas as pd
+import joblib
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from curl_cffi import requests as curl_requests
+try:
+    from .file_io import write_frame
+except ImportError: #imported with src/data_pipeline on the path, or run as a script
+    from file_io import write_frame
+
+BATCH_SIZE = 20 #number of tickers requested from yahoo in a single call
+MAX_WORKERS = 8 #number of batches downloaded at the same time
+#on-disk cache of yahoo responses, in the project's data folder wherever the script is run from
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'Cache'))
+CACHE_EXPIRY_HOURS = 6 #cached responses older than this are downloaded again
+CACHE_BYTES_LIMIT = '1G' #the cache is trimmed to this size after each download_all, least recently used first
+
+memory = joblib.Memory(CACHE_DIR, verbose=0)
+
+#one http session shared by every batch request, so connections (and their TLS handshakes) are
+#reused. yf.download opens a new session for each call otherwise.
+_SESSION = curl_requests.Session(impersonate='chrome')
 
 
 
 
 def download_data(ticker : str, start_date: str, end_date:str, save_path:str):
     """
-    Downloads historical stock data and appends it to a single CSV file.
+    Downloads historical stock data and appends it to a single CSV or Parquet file.
 
     A "Ticker" column is added to distinguish data from different stocks. If the
-    target file does not exist, it is created with a header. Otherwise, the new
-    data is appended without a header.
+    target file does not exist, it is created. Otherwise, the new data is appended
+    to it.
 
 
     Returns:
@@ -29,14 +50,9 @@ def download_data(ticker : str, start_date: str, end_date:str, save_path:str):
         # reset the index to make 'Date' a column
         data.reset_index(inplace=True)
         
-        # check if file exists to determine if we should write headers
-        output_dir = os.path.dirname(save_path) 
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True) #creates raw directory if it doesn't exist 
-        
         file_exists = os.path.exists(save_path) 
 
-        data.to_csv(save_path, mode='a', header= not file_exists, index=False) 
+        write_frame(data, save_path, append=True) #creates the file or adds the rows to it
         
         if not file_exists: #if the file does not exist 
             print(f"Created file and saved data for {ticker} to {save_path}") 
@@ -47,7 +63,105 @@ def download_data(ticker : str, start_date: str, end_date:str, save_path:str):
     except Exception as e: #if there is an error: print the error message
         print(f"An error occured while downloading data for {ticker}: {e}")
         return None
-    
 
 
+class IncompleteDownload(Exception):
+    """
+    Raised by _cached_download when yahoo returned no data for some of the tickers, so
+    the result isn't cached. The rows that did come back are kept in .data.
+    """
+    def __init__(self, data: pd.DataFrame, failed: list):
+        super().__init__(f"no data for {failed}")
+        self.data = data
+        self.failed = failed
+
+
+@memory.cache(ignore=['threads'], cache_validation_callback=joblib.expires_after(hours=CACHE_EXPIRY_HOURS))
+def _cached_download(tickers: tuple, start_date: str, end_date: str, threads: bool):
+    """
+    Batch request to yahoo, cached on disk by (tickers, start_date, end_date) so
+    repeated runs over the same window skip the network.
+
+    yfinance doesn't raise when a request fails, it logs the error and leaves the
+    ticker's columns empty. Raising IncompleteDownload in that case keeps the failed
+    result out of the cache, so the next run asks yahoo again instead of getting
+    "no data" back until the cache expires.
+    """
+    # _SESSION is used as a global rather than an argument, so it isn't part of the cache key.
+    # progress=False since batches run at the same time and their progress bars would interleave.
+    data = yf.download(tickers=list(tickers), start=start_date, end=end_date, group_by='ticker',
+                       threads=threads, progress=False, session=_SESSION)
+    if data.empty:
+        raise IncompleteDownload(data, list(tickers))
+    # a ticker whose columns are all NaN got no rows back (a failed request, or no data in the window)
+    got_data = data.notna().any().groupby(level=0).any()
+    failed = [ticker for ticker in tickers if not got_data.get(ticker, False)]
+    if failed:
+        raise IncompleteDownload(data, failed)
+    return data
+
+
+def download_batch(tickers: list, start_date: str, end_date: str, threads: bool = True):
+    """
+    Downloads historical stock data for several tickers in a single request.
+
+    yfinance returns the batch with (Ticker, Price) column levels; the ticker level
+    is moved into the rows so the result has the same long format as download_data,
+    one row per Date and a "Ticker" column to distinguish the stocks.
+
+    threads should be False when the batch itself runs in a worker thread, so
+    yfinance does not start another thread pool inside it.
+
+    Returns:
+        pd.DataFrame: A DataFrame of the downloaded data, or None on failure.
+    """
+    try:
+        try:
+            data = _cached_download(tuple(tickers), start_date, end_date, threads)
+        except IncompleteDownload as e: #not cached, but the tickers that did download are still used
+            data = e.data
+            if not data.empty:
+                print(f"No data found for tickers {e.failed} from {start_date} to {end_date}.")
+        if data.empty: #check if there is no data available
+            print(f"No data found for tickers {tickers} from {start_date} to {end_date}.")
+            return None
+
+        # stack the ticker level into the index, dropping dates a ticker has no data for
+        data = data.stack(level=0, future_stack=True).dropna(how='all')
+        data = data.rename_axis(['Date', 'Ticker']).reset_index()
+        data.columns.name = None
+
+        return data
+    except Exception as e: #if there is an error: print the error message
+        print(f"An error occured while downloading data for {tickers}: {e}")
+        return None
+
+
+def download_all(tickers: list, start_date: str, end_date: str):
+    """
+    Downloads historical stock data for any number of tickers.
+
+    Tickers are split into batches of BATCH_SIZE, one request per batch, and up to
+    MAX_WORKERS batches are downloaded at the same time. Nothing is written to disk
+    apart from the download cache, which is trimmed to CACHE_BYTES_LIMIT afterwards.
 
+    Returns:
+        pd.DataFrame: The combined data in the long Date/Ticker format, or None if
+        nothing could be downloaded.
+    """
+    batches = [tickers[i:i + BATCH_SIZE] for i in range(0, len(tickers), BATCH_SIZE)]
+
+    print(f"--- Downloading data for {len(tickers)} tickers in {len(batches)} batches ---")
+    # downloads are network bound, so threads overlap the requests. threads=False stops
+    # yfinance from nesting its own thread pool inside each worker.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(lambda batch: download_batch(batch, start_date, end_date, threads=False), batches)
+        downloaded = [df for df in results if df is not None] #results come back in batch order
+
+    # expired responses are never read again, and each new date window adds entries, so
+    # remove the expired ones and cap the cache size instead of letting it grow forever
+    memory.reduce_size(bytes_limit=CACHE_BYTES_LIMIT, age_limit=datetime.timedelta(hours=CACHE_EXPIRY_HOURS))
+
+    if not downloaded:
+        return None
+    return pd.concat(downloaded, ignore_index=True)
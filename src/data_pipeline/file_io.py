@@ -0,0 +1,128 @@
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+CHUNK_ROWS = 100_000 #rows read at a time when a row filter is given
+
+
+def read_columns(path: str) -> list:
+    """
+    Returns the column names of a .parquet or .csv file without reading its rows.
+    """
+    if path.endswith('.parquet'):
+        return ds.dataset(path, format='parquet').schema.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_frame(path: str, columns: list = None, row_filter=None) -> pd.DataFrame:
+    """
+    Reads a DataFrame from a .parquet or .csv file, chosen by the file extension.
+    A .parquet path can be a single file or a folder of part files written by write_frame.
+
+    columns: optional list of columns to load. Columns that are not in the file are
+    skipped, and for parquet files only the requested columns are read from disk.
+    row_filter: optional function that takes a DataFrame and returns the rows to keep.
+    The file is then read CHUNK_ROWS rows at a time and only the kept rows are held
+    in memory.
+
+    Returns:
+        pd.DataFrame: The loaded data with 'Date' parsed as datetimes.
+    """
+    if path.endswith('.parquet'):
+        if columns is not None:
+            available = read_columns(path)
+            columns = [col for col in columns if col in available]
+        if row_filter is None:
+            return pd.read_parquet(path, columns=columns)
+        batches = ds.dataset(path, format='parquet').to_batches(columns=columns, batch_size=CHUNK_ROWS)
+        return pd.concat([row_filter(batch.to_pandas()) for batch in batches], ignore_index=True)
+
+    if row_filter is None:
+        # pyarrow's csv reader parses the file on all cores. Ticker is read as a plain
+        # string so tickers like "NA" or "TRUE" aren't turned into nulls or bools.
+        header = read_columns(path)
+        include = header if columns is None else [col for col in columns if col in header]
+        convert_options = pacsv.ConvertOptions(include_columns=include, column_types={'Ticker': pa.string()})
+        df = pacsv.read_csv(path, convert_options=convert_options).to_pandas()
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'])
+        return df
+
+    # the chunked read stays on pandas' reader, pyarrow's streaming reader fixes column
+    # types from the first block and fails if a later block differs. Ticker is pinned to
+    # string so a chunk holding only a ticker like "TRUE" isn't parsed as bools.
+    usecols = None if columns is None else (lambda col: col in columns)
+    chunks = pd.read_csv(path, usecols=usecols, parse_dates=['Date'], chunksize=CHUNK_ROWS,
+                         dtype={'Ticker': 'string'}, keep_default_na=False, na_values=[''])
+    return pd.concat([row_filter(chunk) for chunk in chunks], ignore_index=True)
+
+
+def write_frame(df: pd.DataFrame, path: str, append: bool = False):
+    """
+    Writes a DataFrame to a .parquet or .csv file, chosen by the file extension.
+    Both formats are written by pyarrow.
+
+    With append=True the rows are added after the ones already in the file. A parquet
+    file can't be appended to in place, so a .parquet path is a folder of part files and
+    each append writes the new rows as the next part, without reading the existing ones.
+    """
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True) #creates the output directory if it doesn't exist
+
+    file_exists = os.path.exists(path)
+
+    if path.endswith('.parquet'):
+        _write_parquet_part(df, path, append and file_exists)
+    else:
+        write_header = not (append and file_exists)
+        if not write_header:
+            df = df.reindex(columns=pd.read_csv(path, nrows=0).columns) #match the existing header's column order
+        # pyarrow's csv writer formats the numbers in C++ instead of through python's csv module
+        with open(path, 'wb' if write_header else 'ab') as file:
+            pacsv.write_csv(_to_csv_table(df), file, write_options=pacsv.WriteOptions(include_header=write_header))
+
+
+def _write_parquet_part(df: pd.DataFrame, path: str, append: bool):
+    """
+    Writes df as the next part-NNNNN.parquet file in the folder at path. Without append the
+    folder is replaced and df becomes its first part. Appended parts are cast to the first
+    part's schema, so every part reads back with the same column order and types.
+    """
+    if append and os.path.isfile(path): #a single parquet file from before, it becomes the first part
+        os.rename(path, path + '.tmp')
+        os.makedirs(path)
+        os.rename(path + '.tmp', os.path.join(path, 'part-00000.parquet'))
+
+    if append:
+        parts = sorted(name for name in os.listdir(path) if name.endswith('.parquet'))
+        schema = pq.read_schema(os.path.join(path, parts[0]))
+        df = df.reindex(columns=schema.names) #match the existing parts' column order
+        table = pa.Table.from_pandas(df, preserve_index=False).cast(schema)
+    else:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        os.makedirs(path)
+        parts = []
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    pq.write_table(table, os.path.join(path, f'part-{len(parts):05d}.parquet'), compression='zstd')
+
+
+def _to_csv_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Converts a DataFrame to an arrow table for writing to csv. Datetime columns that only
+    hold midnight timestamps become plain dates, so they are written as 2023-01-01 like
+    pandas' to_csv does, rather than with a time part.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_dtype(df[col]) and (df[col] == df[col].dt.normalize()).all():
+            table = table.set_column(table.schema.get_field_index(col), col, table[col].cast(pa.date32()))
+    return table
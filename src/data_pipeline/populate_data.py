@@ -8,12 +8,12 @@ def populate_data(tickers_file_path: str, raw_data_path: str, processed_data_pat
     """
     Centralized caller to fetch and process data.
     1. Loads raw data from Yahoo Finance using a list of tickers.
-    2. Processes the raw data and saves it.
+    2. Processes the downloaded data (kept in memory) and saves it.
     """
     # Step 1: Download data using the data_loader
     print("--- Starting Data Population ---")
     print(f"Loading raw data based on tickers from {tickers_file_path}...")
-    load_data(
+    raw_df = load_data(
         file_path_tickers=tickers_file_path,
         start_date=start_date,
         end_date=end_date,
@@ -24,9 +24,13 @@ def populate_data(tickers_file_path: str, raw_data_path: str, processed_data_pat
 
     # Step 2: Process the downloaded raw data
     print(f"\nProcessing raw data from {raw_data_path}...")
+    # Hand the downloaded frame over directly instead of reading it back from disk.
+    # If the download failed, raw_df is None and the existing raw file is used.
     processed_df = process_data(
         raw_data_path=raw_data_path,
-        processed_data_path=processed_data_path
+        processed_data_path=processed_data_path,
+        raw_df=raw_df,
+        verbose=False # thousands of tickers, only the run summary is printed
     )
 
     if processed_df is not None:
@@ -44,8 +48,8 @@ def call_populate_data(tickers_file_path: str, raw_data_path: str, processed_dat
 if __name__ == "__main__":
     # Define paths and parameters for the script
     TICKERS_FILE = 'src/data_pipeline/nasdaq_tickers.txt' 
-    RAW_DATA_PATH = 'data/Raw/raw_data.csv'
-    PROCESSED_DATA_PATH = 'data/Processed/processed_data.csv'
+    RAW_DATA_PATH = 'data/Raw/raw_data.parquet'
+    PROCESSED_DATA_PATH = 'data/Processed/processed_data.parquet'
     START_DATE = '2020-01-01' 
     END_DATE = '2023-01-01'
 
@@ -1,29 +1,151 @@
 import pandas as pd
+import numpy as np
 import pandas_ta as ta
 from sklearn.preprocessing import StandardScaler
 import os
 import joblib
 import warnings
+try:
+    from .file_io import read_frame, write_frame
+except ImportError: #imported with src/data_pipeline on the path, or run as a script
+    from file_io import read_frame, write_frame
 
 # Suppress SettingWithCopyWarning, as we use .copy() where needed
 pd.options.mode.chained_assignment = None
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-def process_data(raw_data_path: str, processed_data_path: str)-> pd.DataFrame: 
+# Columns read from the raw data file, anything else in the file is skipped
+RAW_COLUMNS = ['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume']
+# Days of history kept before a ticker's last processed date so indicators of new rows
+# can be calculated on incremental runs (e.g., SMA_50 needs 50 days).
+BUFFER_DAYS = 100  #CAN CHANGE THIS, 100 IS A VALID BUFFER FOR THIS PROJECT
+# Identifier and target columns, never scaled
+NON_FEATURE_COLS = frozenset(['Ticker', 'Date', 'y'])
+
+
+def _process_ticker(ticker: str, group: pd.DataFrame, last_date, original_cols: list, verbose: bool = True) -> pd.DataFrame:
+    """
+    Calculates the features and target for one ticker's raw rows.
+
+    Runs in a worker process, so it only uses its arguments and module-level names.
+
+    Args:
+        ticker (str): The ticker being processed.
+        group (pd.DataFrame): The raw rows of this ticker, sorted by date, without the Ticker column.
+        last_date (pd.Timestamp): Last processed date of the ticker, or None if it hasn't been processed yet.
+        original_cols (list): The raw data columns, used to tell the calculated features apart.
+        verbose (bool): Whether to print progress messages for this ticker.
+
+    Returns:
+        pd.DataFrame: The processed (unscaled) new rows, or None if there are none.
+    """
+    if verbose:
+        print(f"--- Processing ticker: {ticker} ---")
+
+    # --- Data Sufficiency Check ---
+    # Skip tickers with too few data points to calculate indicators reliably.
+    # 50 is a safe buffer for the longest default indicator (SMA_50).
+    if len(group) < 50: 
+        if verbose:
+            print(f"Skipping {ticker}: not enough data points ({len(group)}) for feature calculation.")
+        return None 
+
+    if last_date:
+        # For incremental runs, we need a buffer of old data to correctly calculate indicators
+        # for the first few new data points.
+        buffer_start_date = last_date - pd.Timedelta(days=BUFFER_DAYS)
+
+        # Get the new data that needs to be processed
+        new_data_to_process = group[group['Date'] > last_date]   
+        if new_data_to_process.empty == True: #skip if no new data
+            if verbose:
+                print(f"No new data for {ticker}. Skipping.")
+            return None
+
+        if verbose:
+            print(f"Found {len(new_data_to_process)} new rows for {ticker}.")
+        # The group we'll run calculations on includes a buffer of historical data and the new data.
+        # Rows are in date order, so that is every row from the buffer start on.
+        calc_group = group[group['Date'] >= buffer_start_date].set_index('Date')
+    else:
+        # This is the first time we're seeing this ticker, or it's a full run
+        if verbose:
+            print(f"Processing all {len(group)} rows for {ticker}.")
+        new_data_to_process = group
+        # set_index returns a new frame, so features can be added without copying the group first
+        calc_group = group.set_index('Date')
+
+
+    # --- Feature Engineering ---
+    # rows are already in date order, process_data sorts the raw data before grouping
+
+    # Calculate technical indicators using pandas_ta 
+    calc_group.ta.rsi(length=14, append=True)
+    calc_group.ta.sma(length=20, append=True)
+    calc_group.ta.sma(length=50, append=True)
+    calc_group.ta.ema(length=10, append=True)
+    calc_group.ta.macd(append=True)
+    calc_group.ta.atr(length=14, append=True)
+    calc_group.ta.obv(append=True)
+
+    # Calculate returns
+    calc_group['return_1d'] = calc_group['Close'].pct_change(1)
+    calc_group['return_5d'] = calc_group['Close'].pct_change(5)
+
+    # --- FIX LOOKAHEAD BIAS ---
+
+    # Dynamically identify all newly added columns (indicators and returns)
+    feature_cols = [col for col in calc_group.columns if col not in original_cols] 
+    # Shift all calculated features by 1 to prevent using current-day info for prediction
+    calc_group[feature_cols] = calc_group[feature_cols].shift(1)
+
+    # --- Target Variable ---
+    # y=1 if next day's close is higher, 0 otherwise. This is the label, so it uses future info.
+    calc_group['y'] = (calc_group['Close'].shift(-1) > calc_group['Close']).astype(int) #shift -1 gets last day's close, so we can compare it to todays' close
+
+    # --- Data Cleaning & Finalize Processed Rows ---
+    # Forward-fill handles NaNs from non-trading days or initial buffer period
+    calc_group.ffill(inplace=True)
+    # Filter out the buffer rows, keeping only the new data we intended to process. The index
+    # is sorted, so this is a slice and the check below only scans the new rows.
+    first_new_date = new_data_to_process['Date'].min()
+    new_rows = calc_group.loc[first_new_date:]
+    # Drop any remaining NaNs (e.g., at the very start of the history or the last row for 'y') and
+    # infinite values (e.g., a return after a zero close, which the scaler can't handle).
+    # np.isfinite catches both in a single pass over the numeric values.
+    is_finite = np.isfinite(new_rows.select_dtypes('number').to_numpy(dtype='float64')).all(axis=1)
+    final_new_rows = new_rows[is_finite].reset_index() # Move 'Date' from index to column
+
+    if final_new_rows.empty:
+        if verbose:
+            print(f"No usable new rows for {ticker} after cleaning. Skipping.")
+        return None
+
+    final_new_rows.insert(1, 'Ticker', ticker) # Re-add ticker column, after 'Date' as in the raw data
+    if verbose:
+        print(f"Added {len(final_new_rows)} processed rows for {ticker}.")
+    return final_new_rows
+
+
+def process_data(raw_data_path: str, processed_data_path: str, raw_df: pd.DataFrame = None, verbose: bool = True)-> pd.DataFrame: 
     """
     Loads raw stock data, calculates features, normalizes it, and saves the processed data.
 
     This function supports incremental updates. On the first run, it processes the entire
     raw data file, fits a StandardScaler, saves the processed data, and saves the scaler.
-    On subsequent runs, it loads the existing processed data and the scaler, identifies
-    new raw data for each ticker, processes only the new data, and appends it to the
-    processed file.
+    On subsequent runs, it loads the last processed date of each ticker and the scaler,
+    reads only the raw rows within BUFFER_DAYS of those dates (plus any new tickers),
+    processes only the new data, and appends it to the processed file.
 
     Args:
-        raw_data_path (str): Path to the CSV file containing raw stock data.
-        processed_data_path (str): Path to save the processed CSV file.
+        raw_data_path (str): Path to the CSV or Parquet file containing raw stock data.
+        processed_data_path (str): Path to save the processed CSV or Parquet file.
+        raw_df (pd.DataFrame, optional): Raw data already in memory (e.g., just downloaded).
+            When given, it is used instead of reading raw_data_path.
+        verbose (bool, optional): Whether to print a progress message for every ticker. Set to
+            False for large ticker lists, the run summary is printed either way.
     """
-    if not os.path.exists(raw_data_path):
+    if raw_df is None and not os.path.exists(raw_data_path):
         print(f"Error: Raw data file not found at {raw_data_path}")
         return None
 
@@ -31,30 +153,6 @@ def process_data(raw_data_path: str, processed_data_path: str)-> pd.DataFrame:
     scaler_path = os.path.join(os.path.dirname(processed_data_path), 'scaler.joblib') #need to save scaler in same directory as processed data
     os.makedirs(os.path.dirname(processed_data_path), exist_ok=True) #make directory if it doesn't exist
 
-    print("Loading raw data...")
-    raw_df = pd.read_csv(raw_data_path, parse_dates=['Date'])
-
-    # --- Data Validation & Cleaning ---
-    # Convert core columns to numeric, coercing errors to NaN. This handles any non-numeric
-    # values (e.g., error strings) that might have been saved in the raw CSV.
-    for col in ['Open', 'High', 'Low', 'Close', 'Volume']:#changes the strings to numbers, in said colums
-        if col in raw_df.columns:
-            raw_df[col] = pd.to_numeric(raw_df[col], errors='coerce')  
-            #coerce means that if the string is not a number, it will change it to a NaN
-    
-    # Drop rows where essential data is missing (e.g., after coercion)
-    raw_df.dropna(subset=['Close', 'Volume'], inplace=True) #drop rows where close or volume is NaN
-
-    if raw_df.duplicated(subset=['Ticker', 'Date']).any(): #if there are duplicate ticker-date rows, keep the lastest one
-        print("Warning: Found duplicate Ticker-Date rows. Keeping the last entry for each.")
-        raw_df.drop_duplicates(subset=['Ticker', 'Date'], keep='last', inplace=True)
-
-    if 'Ticker' not in raw_df.columns: #if ticker not in column, just return None
-        print("Error: 'Ticker' column not found in raw data.")
-        return None
-
-
-
     # --- Determine Run Type: Full or Incremental ---
     #Full meaning that there is no pre-existing data. 
     #incremental meaning that there is already data, just adding onto it. 
@@ -65,7 +163,7 @@ def process_data(raw_data_path: str, processed_data_path: str)-> pd.DataFrame:
     if is_incremental_run: #already has processed data.
         print("RUN TYPE: Incremental update.") 
         print("Loading existing processed data to determine last entry dates...")
-        existing_df = pd.read_csv(processed_data_path, parse_dates=['Date'])
+        existing_df = read_frame(processed_data_path, columns=['Date', 'Ticker']) #only the columns needed for the dates
         # Get the last date for each ticker from the existing data
         last_dates = existing_df.groupby('Ticker')['Date'].max().to_dict() 
     else: #no pre-existing data. 
@@ -74,100 +172,82 @@ def process_data(raw_data_path: str, processed_data_path: str)-> pd.DataFrame:
              print(f"WARNING: Processed file '{processed_data_path}' exists but scaler is missing. Will overwrite.")
         elif os.path.exists(scaler_path):
              print(f"WARNING: Scaler file '{scaler_path}' exists but processed data is missing. Will overwrite.")
+
+    # For incremental runs only the buffer window and the new rows of each known ticker are
+    # needed, so older raw rows are dropped while the file is read chunk by chunk.
+    buffer_starts = {ticker: last_date - pd.Timedelta(days=BUFFER_DAYS) for ticker, last_date in last_dates.items()}
+
+    def keep_needed_rows(chunk: pd.DataFrame) -> pd.DataFrame:
+        if 'Ticker' not in chunk.columns:
+            return chunk
+        start = chunk['Ticker'].map(buffer_starts) #NaT for tickers that haven't been processed yet
+        return chunk[start.isna() | (chunk['Date'] >= start)]
+
+    # Full runs need every row, so the filter is only used on incremental runs. Without it the
+    # raw file is read in one go, which for csv files uses pyarrow's multithreaded reader.
+    row_filter = keep_needed_rows if buffer_starts else None
+
+    if raw_df is None:
+        print("Loading raw data...")
+        raw_df = read_frame(raw_data_path, columns=RAW_COLUMNS, row_filter=row_filter)
+    else:
+        # selecting the columns gives a new frame, so the caller's data isn't modified below
+        raw_df = raw_df[[col for col in RAW_COLUMNS if col in raw_df.columns]]
+        if row_filter is not None:
+            raw_df = row_filter(raw_df)
+
+    if 'Ticker' not in raw_df.columns: #if ticker not in column, just return None
+        print("Error: 'Ticker' column not found in raw data.")
+        return None
+
+    # Categorical tickers are stored as integer codes, which makes the dedup, sort and
+    # groupby below work on ints instead of hashing strings. This is done after the
+    # chunked read, since chunks would each get their own categories.
+    raw_df['Ticker'] = raw_df['Ticker'].astype('category')
+
+    # --- Data Validation & Cleaning ---
+    # Convert core columns to numeric, coercing errors to NaN. This handles any non-numeric
+    # values (e.g., error strings) that might have been saved in the raw file.
+    for col in ['Open', 'High', 'Low', 'Close', 'Volume']:#changes the strings to numbers, in said colums
+        if col in raw_df.columns:
+            raw_df[col] = pd.to_numeric(raw_df[col], errors='coerce')  
+            #coerce means that if the string is not a number, it will change it to a NaN
+
+    # Prices fit easily in float32, which halves the memory of the frame and the bytes the
+    # indicator calculations scan. Volume keeps 64 bits, some tickers trade more shares
+    # in a day than int32 can hold.
+    price_cols = [col for col in ['Open', 'High', 'Low', 'Close'] if col in raw_df.columns]
+    raw_df[price_cols] = raw_df[price_cols].astype('float32')
+    
+    # Drop rows where essential data is missing (e.g., after coercion)
+    raw_df.dropna(subset=['Close', 'Volume'], inplace=True) #drop rows where close or volume is NaN
+
+    if raw_df.duplicated(subset=['Ticker', 'Date']).any(): #if there are duplicate ticker-date rows, keep the lastest one
+        print("Warning: Found duplicate Ticker-Date rows. Keeping the last entry for each.")
+        raw_df.drop_duplicates(subset=['Ticker', 'Date'], keep='last', inplace=True)
+
+    # Sort once so every ticker group is already in chronological order
+    raw_df.sort_values(['Ticker', 'Date'], inplace=True)
+
+
      #########################################################
      # --- Process Data Ticker by Ticker ---
     #########################################################
 
-    all_new_data = [] 
-    total_rows_added = 0
     # Store original columns to dynamically find indicator columns later
-    original_cols = raw_df.columns.tolist() 
+    # 'Ticker' isn't sent to the workers, see below
+    original_cols = [col for col in raw_df.columns if col != 'Ticker']
 
     # --- Process Data Ticker by Ticker ---
-    for ticker, group in raw_df.groupby('Ticker'): #group by ticker, so we can process each ticker separately
-        print(f"--- Processing ticker: {ticker} ---")
-
-        # --- Data Sufficiency Check ---
-        # Skip tickers with too few data points to calculate indicators reliably.
-        # 50 is a safe buffer for the longest default indicator (SMA_50).
-        if len(group) < 50: 
-            print(f"Skipping {ticker}: not enough data points ({len(group)}) for feature calculation.") 
-            continue 
-
-        last_date = last_dates.get(ticker)  #get the last date for a ticker, which is important for the buffer. 
-        if last_date:
-            # For incremental runs, we need a buffer of old data to correctly calculate indicators
-            # for the first few new data points (e.g., SMA_50 needs 50 days).
-            buffer_days = 100  #CAN CHANGE THIS, 100 IS A VALID BUFFER FOR THIS PROJECT     
-            buffer_start_date = last_date - pd.Timedelta(days=buffer_days) 
-
-            # Get the new data that needs to be processed
-            new_data_to_process = group[group['Date'] > last_date]   
-            if new_data_to_process.empty == True: #skip if no new data
-                print(f"No new data for {ticker}. Skipping.")
-                continue
-
-            print(f"Found {len(new_data_to_process)} new rows for {ticker}.")
-            # Get historical data to serve as a buffer for calculations
-            historical_buffer = group[(group['Date'] <= last_date) & (group['Date'] >= buffer_start_date)]
-            # The group we'll run calculations on includes the buffer and the new data
-            calc_group = pd.concat([historical_buffer, new_data_to_process]).copy()
-        else:
-            # This is the first time we're seeing this ticker, or it's a full run
-            print(f"Processing all {len(group)} rows for {ticker}.")
-            new_data_to_process = group
-            calc_group = group.copy()
-
-
-        # --- Feature Engineering ---
-        calc_group.set_index('Date', inplace=True)
-        calc_group.sort_index(inplace=True) # Ensure data is sorted chronologically before calculations
-
-        # Calculate technical indicators using pandas_ta 
-        calc_group.ta.rsi(length=14, append=True)
-        calc_group.ta.sma(length=20, append=True)
-        calc_group.ta.sma(length=50, append=True)
-        calc_group.ta.ema(length=10, append=True)
-        calc_group.ta.macd(append=True)
-        calc_group.ta.atr(length=14, append=True)
-        calc_group.ta.obv(append=True)
-
-        # Calculate returns
-        calc_group['return_1d'] = calc_group['Close'].pct_change(1)
-        calc_group['return_5d'] = calc_group['Close'].pct_change(5)
-
-        # --- FIX LOOKAHEAD BIAS ---
-
-        # Dynamically identify all newly added columns (indicators and returns)
-        feature_cols = [col for col in calc_group.columns if col not in original_cols] 
-        # Shift all calculated features by 1 to prevent using current-day info for prediction
-        calc_group[feature_cols] = calc_group[feature_cols].shift(1)
-
-        # --- Target Variable ---
-        # y=1 if next day's close is higher, 0 otherwise. This is the label, so it uses future info.
-        calc_group['y'] = (calc_group['Close'].shift(-1) > calc_group['Close']).astype(int) #shift -1 gets last day's close, so we can compare it to todays' close
-
-        # --- Data Cleaning ---
-        # Forward-fill handles NaNs from non-trading days or initial buffer period
-        calc_group.ffill(inplace=True)
-        # Drop any remaining NaNs (e.g., at the very start of the history or the last row for 'y')
-        calc_group.dropna(inplace=True)
-
-        # --- Finalize Processed Rows ---
-        # Filter out the buffer rows, keeping only the new data we intended to process
-        first_new_date = new_data_to_process['Date'].min()
-        final_new_rows = calc_group[calc_group.index >= first_new_date].copy()
-        final_new_rows.reset_index(inplace=True) # Move 'Date' from index to column
-
-        if final_new_rows.empty:
-            print(f"No usable new rows for {ticker} after cleaning. Skipping.")
-            continue
-
-        final_new_rows['Ticker'] = ticker # Re-add ticker column
-        all_new_data.append(final_new_rows)
-        rows_added = len(final_new_rows)
-        total_rows_added += rows_added
-        print(f"Added {rows_added} processed rows for {ticker}.")
+    # Tickers are independent of each other, so they are processed in parallel worker processes.
+    # Each group is pickled to its worker without the categorical 'Ticker' column, which carries
+    # every ticker's category and would triple the bytes sent. The ticker is passed on its own.
+    results = joblib.Parallel(n_jobs=-1, backend='loky')(
+        joblib.delayed(_process_ticker)(ticker, group.drop(columns='Ticker'), last_dates.get(ticker), original_cols, verbose)
+        for ticker, group in raw_df.groupby('Ticker', sort=False, observed=True) #group by ticker, so we can process each ticker separately
+    )
+    all_new_data = [rows for rows in results if rows is not None]
+    total_rows_added = sum(len(rows) for rows in all_new_data)
 
     if not all_new_data:
         print("\nNo new data was processed across all tickers. Exiting.")
@@ -181,32 +261,32 @@ def process_data(raw_data_path: str, processed_data_path: str)-> pd.DataFrame:
     # Exclude identifiers ('Ticker', 'Date') and the target ('y')
     cols_to_scale = [
         col for col in new_df.columns
-        if new_df[col].dtype in ['int64', 'float64'] and col not in ['Ticker', 'Date', 'y']
+        if new_df[col].dtype in ['int64', 'float64', 'float32'] and col not in NON_FEATURE_COLS
     ] 
-    
-    # Ensure all columns to be scaled are present in the dataframe
-    valid_cols_to_scale = [col for col in cols_to_scale if col in new_df.columns]
 
     if is_incremental_run:
         # On incremental runs, load the existing scaler and just transform the new data
         print("Loading existing scaler and transforming new data...")
-        scaler = joblib.load(scaler_path)
-        new_df[valid_cols_to_scale] = scaler.transform(new_df[valid_cols_to_scale])
+        scaler = joblib.load(scaler_path).set_output(transform='pandas')
+        # Transform exactly the columns (and column order) the scaler was fit on
+        cols_to_scale = list(scaler.feature_names_in_)
+        new_df[cols_to_scale] = scaler.transform(new_df[cols_to_scale])
         
         # Append the newly processed and scaled data to the existing file
         print(f"Appending {len(new_df)} new rows to {processed_data_path}...")
-        new_df.to_csv(processed_data_path, mode='a', header=False, index=False)
+        write_frame(new_df, processed_data_path, append=True)
     else:
         # On a full run, fit the scaler on the entire new dataset
         print("Fitting new scaler on the full dataset...")
-        scaler = StandardScaler()
-        new_df[valid_cols_to_scale] = scaler.fit_transform(new_df[valid_cols_to_scale])
+        # pandas output keeps the column names, so the scaled frame is assigned back by name
+        scaler = StandardScaler().set_output(transform='pandas')
+        new_df[cols_to_scale] = scaler.fit_transform(new_df[cols_to_scale])
         
         # Save the fitted scaler and the full processed dataframe
         print(f"Saving new scaler to {scaler_path}...")
         joblib.dump(scaler, scaler_path)
         print(f"Saving {len(new_df)} new rows to {processed_data_path}...")
-        new_df.to_csv(processed_data_path, mode='w', header=True, index=False)
+        write_frame(new_df, processed_data_path)
 
     print("\nProcessing complete.")
     return new_df
@@ -0,0 +1,80 @@
+import unittest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Add the project root to the Python path
+# This allows us to import modules from the 'src' directory
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.data_pipeline.data_loader import load_data
+
+def fake_download_all(tickers, start_date, end_date):
+    """Stands in for download_all: one row per ticker and business day in [start_date, end_date)."""
+    dates = pd.bdate_range(start_date, pd.Timestamp(end_date) - pd.Timedelta(days=1))
+    if len(dates) == 0:
+        return None
+    df = pd.DataFrame({
+        'Date': np.repeat(dates, len(tickers)),
+        'Ticker': np.tile(tickers, len(dates)),
+    })
+    for col in ['Open', 'High', 'Low', 'Close']:
+        df[col] = 100.0
+    df['Volume'] = 1000
+    return df
+
+class TestLoadData(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary directory with a tickers file."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tickers_file = os.path.join(self.temp_dir.name, 'tickers.txt')
+        with open(self.tickers_file, 'w') as f:
+            f.write("AAPL\nNA\n")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def _load(self, save_path, end_date):
+        """Runs load_data with the download replaced by fake_download_all, returns the result and the mock."""
+        with mock.patch('src.data_pipeline.data_loader.download_all', side_effect=fake_download_all) as download:
+            df = load_data(self.tickers_file, '2022-12-01', end_date, save_path)
+        return df, download
+
+    def _check_incremental_load(self, extension):
+        save_path = os.path.join(self.temp_dir.name, 'raw_data' + extension)
+
+        # First run downloads the whole window. 2023-01-01 is a Sunday, so the last row is Friday 2022-12-30
+        first_df, download = self._load(save_path, '2023-01-01')
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(first_df['Date'].max(), pd.Timestamp('2022-12-30'))
+
+        # Only the weekend is left before the end date, so nothing is requested
+        df, download = self._load(save_path, '2023-01-01')
+        download.assert_not_called()
+        self.assertEqual(len(df), len(first_df))
+
+        # A later end date only requests the days after the last saved date, and appends them
+        df, download = self._load(save_path, '2023-01-05')
+        download.assert_called_once_with(['AAPL', 'NA'], '2022-12-31', '2023-01-05')
+        saved = pd.read_parquet(save_path) if extension == '.parquet' else pd.read_csv(save_path, keep_default_na=False)
+        self.assertEqual(len(saved), len(first_df) + 2 * 3) # 2 tickers, Jan 2nd to 4th
+        self.assertEqual(len(df), len(saved))
+        self.assertEqual(sorted(saved['Ticker'].unique()), ['AAPL', 'NA'])
+        self.assertFalse(saved.duplicated(subset=['Ticker', 'Date']).any())
+
+    def test_incremental_load_parquet(self):
+        """Test that reruns skip up-to-date tickers and append only new days to a parquet file."""
+        self._check_incremental_load('.parquet')
+
+    def test_incremental_load_csv(self):
+        """Test that reruns skip up-to-date tickers and append only new days to a csv file."""
+        self._check_incremental_load('.csv')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,14 @@
 import os
 import pandas as pd
-from fetch_data import download_data
 import shutil
+import sys
+
+# Add the project root to the Python path
+# This allows us to import modules from the 'src' directory
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.data_pipeline.fetch_data import download_data
 
 # Create a directory for test outputs
 TEST_OUTPUT_DIR = "test_output"
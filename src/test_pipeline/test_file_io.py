@@ -0,0 +1,122 @@
+import unittest
+import pandas as pd
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Add the project root to the Python path
+# This allows us to import modules from the 'src' directory
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.data_pipeline.file_io import read_columns, read_frame, write_frame
+
+class TestFileIO(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary directory for the test files."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # tickers like "NA" and "TRUE" must not be read back as missing values or bools
+        self.df = pd.DataFrame({
+            'Date': pd.to_datetime(['2023-01-02', '2023-01-03', '2023-01-02', '2023-01-03']),
+            'Ticker': ['NA', 'NA', 'TRUE', 'TRUE'],
+            'Close': [1.5, 2.5, 3.5, 4.5],
+            'Volume': [100, 200, 300, 400]
+        })
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def _path(self, name):
+        # nested directory, write_frame should create it
+        return os.path.join(self.temp_dir.name, 'nested', name)
+
+    def _assert_same(self, df, expected):
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertEqual(df['Ticker'].tolist(), expected['Ticker'].tolist())
+        self.assertTrue(pd.api.types.is_datetime64_dtype(df['Date']))
+        self.assertEqual(list(df['Date']), list(expected['Date']))
+        self.assertEqual(df['Close'].tolist(), expected['Close'].tolist())
+        self.assertEqual(df['Volume'].tolist(), expected['Volume'].tolist())
+
+    def test_round_trip(self):
+        """Test that a written frame reads back the same, for both formats."""
+        for extension in ['.parquet', '.csv']:
+            with self.subTest(extension=extension):
+                path = self._path('data' + extension)
+                write_frame(self.df, path)
+                self._assert_same(read_frame(path), self.df)
+                self.assertEqual(read_columns(path), list(self.df.columns))
+
+    def test_csv_dates_have_no_time_part(self):
+        """Test that midnight-only dates are written as plain dates, like pandas' to_csv."""
+        path = self._path('data.csv')
+        write_frame(self.df, path)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines[1].startswith('2023-01-02,'), lines[1])
+
+    def test_read_columns_subset(self):
+        """Test that only the requested columns are read and missing ones are skipped."""
+        for extension in ['.parquet', '.csv']:
+            with self.subTest(extension=extension):
+                path = self._path('data' + extension)
+                write_frame(self.df, path)
+                df = read_frame(path, columns=['Date', 'Ticker', 'Missing'])
+                self.assertEqual(list(df.columns), ['Date', 'Ticker'])
+
+    def test_read_with_row_filter(self):
+        """Test that a row filter is applied to every chunk of the file."""
+        for extension in ['.parquet', '.csv']:
+            with self.subTest(extension=extension):
+                path = self._path('data' + extension)
+                write_frame(self.df, path)
+                # one row per chunk, so the chunk holding only "TRUE" rows is read on its own
+                with mock.patch('src.data_pipeline.file_io.CHUNK_ROWS', 1):
+                    df = read_frame(path, row_filter=lambda chunk: chunk[chunk['Close'] > 2])
+                self.assertEqual(df['Ticker'].tolist(), ['NA', 'TRUE', 'TRUE'])
+                self.assertEqual(df['Close'].tolist(), [2.5, 3.5, 4.5])
+
+    def test_append(self):
+        """Test that appended rows follow the existing ones, matching the existing csv column order."""
+        first, second = self.df.iloc[:2], self.df.iloc[2:]
+        for extension in ['.parquet', '.csv']:
+            with self.subTest(extension=extension):
+                path = self._path('data' + extension)
+                write_frame(first, path, append=True) #appending to a missing file creates it
+                write_frame(second[['Volume', 'Close', 'Ticker', 'Date']], path, append=True)
+                df = read_frame(path)
+                self._assert_same(df[list(self.df.columns)], self.df)
+                if extension == '.csv':
+                    self.assertEqual(list(df.columns), list(self.df.columns))
+
+    def test_parquet_append_adds_a_part(self):
+        """Test that a parquet append writes a new part file and leaves the existing one untouched."""
+        path = self._path('data.parquet')
+        write_frame(self.df.iloc[:2], path)
+        first_part = os.path.join(path, 'part-00000.parquet')
+        mtime = os.stat(first_part).st_mtime_ns
+        # float volumes are cast to the existing part's int column
+        write_frame(self.df.iloc[2:].astype({'Volume': 'float64'}), path, append=True)
+        self.assertEqual(sorted(os.listdir(path)), ['part-00000.parquet', 'part-00001.parquet'])
+        self.assertEqual(os.stat(first_part).st_mtime_ns, mtime)
+        self._assert_same(read_frame(path), self.df)
+
+        # a full write replaces all the parts
+        write_frame(self.df.iloc[:1], path)
+        self.assertEqual(os.listdir(path), ['part-00000.parquet'])
+        self.assertEqual(len(read_frame(path)), 1)
+
+    def test_parquet_append_to_single_file(self):
+        """Test that appending to a single parquet file turns it into the first part."""
+        path = self._path('data.parquet')
+        os.makedirs(os.path.dirname(path))
+        self.df.iloc[:2].to_parquet(path, index=False)
+        write_frame(self.df.iloc[2:], path, append=True)
+        self.assertEqual(sorted(os.listdir(path)), ['part-00000.parquet', 'part-00001.parquet'])
+        self._assert_same(read_frame(path), self.df)
+
+if __name__ == '__main__':
+    unittest.main()
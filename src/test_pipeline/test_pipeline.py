@@ -1,33 +1,44 @@
 import unittest
 import os
-import shutil
+import tempfile
 import pandas as pd
+import sys
 
-from data_loader import load_data
-from process_data import process_data
+# Add the project root to the Python path
+# This allows us to import modules from the 'src' directory
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.data_pipeline.data_loader import load_data
+from src.data_pipeline.process_data import process_data
 
 class TestDataPipeline(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up a temporary environment for testing."""
-        self.temp_dir = "temp_test_data"
-        self.raw_data_dir = os.path.join(self.temp_dir, "raw")
-        self.processed_data_dir = os.path.join(self.temp_dir, "processed")
-        self.tickers_file = os.path.join(self.temp_dir, "tickers.txt")
-        self.raw_data_path = os.path.join(self.raw_data_dir, "raw_data.csv")
-        self.processed_data_path = os.path.join(self.processed_data_dir, "processed_data.csv")
-
-        os.makedirs(self.raw_data_dir, exist_ok=True)
-        os.makedirs(self.processed_data_dir, exist_ok=True)
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.tickers_file = os.path.join(cls.temp_dir.name, "tickers.txt")
 
-        with open(self.tickers_file, "w") as f:
+        with open(cls.tickers_file, "w") as f:
             f.write("AAPL\n")
             f.write("GOOG\n")
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up the temporary environment."""
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        """Give each test its own raw and processed data directories."""
+        test_dir = tempfile.mkdtemp(dir=self.temp_dir.name)
+        self.raw_data_dir = os.path.join(test_dir, "raw")
+        self.processed_data_dir = os.path.join(test_dir, "processed")
+        self.raw_data_path = os.path.join(self.raw_data_dir, "raw_data.csv")
+        self.processed_data_path = os.path.join(self.processed_data_dir, "processed_data.csv")
+
+        os.makedirs(self.raw_data_dir)
+        os.makedirs(self.processed_data_dir)
 
     def test_full_pipeline(self):
         """Test the full data loading and processing pipeline."""
@@ -1,45 +1,69 @@
 import unittest
 import os
 import pandas as pd
-from process_data import process_data
 import shutil
+import sys
+import tempfile
 import numpy as np
 
+# Add the project root to the Python path
+# This allows us to import modules from the 'src' directory
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.data_pipeline.process_data import process_data
+
 class TestProcessDataSafely(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        """
+        This method runs ONCE, before the tests.
+        It creates a temporary directory and the
+        sample raw data file, which the tests only ever get a copy of.
+        """
+        cls.test_dir = tempfile.TemporaryDirectory()
+        cls.sample_data_path = os.path.join(cls.test_dir.name, "sample_raw_data.csv")
+
+        # Create a sample raw data file to be used by the tests.
+        # A handful of rows, so it is written as plain text rather than through to_csv
+        sample_csv = (
+            "Date,Ticker,Open,Close\n"
+            "2023-01-01,AAPL,100,110\n"
+            "2023-01-02,AAPL,110,108\n"
+            "2023-01-01,GOOG,2000,2025\n"
+            "2023-01-02,GOOG,2020,2015\n"
+        )
+        with open(cls.sample_data_path, 'w') as f:
+            f.write(sample_csv)
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        This method runs ONCE, after the tests.
+        It completely removes the temporary directory and all its contents.
+        """
+        cls.test_dir.cleanup()
+
     def setUp(self):
         """
         This method runs BEFORE each test.
-        It creates a dedicated, temporary directory structure for testing.
+        It creates a dedicated directory structure for the test, with its own copy of the sample data.
         """
-        self.test_dir = "test_artefacts"  # Main test folder
-        self.raw_dir = os.path.join(self.test_dir, "raw")
-        self.processed_dir = os.path.join(self.test_dir, "processed")
+        test_dir = tempfile.mkdtemp(dir=self.test_dir.name)
+        self.raw_dir = os.path.join(test_dir, "raw")
+        self.processed_dir = os.path.join(test_dir, "processed")
 
         # Create the entire directory structure
-        os.makedirs(self.raw_dir, exist_ok=True)
-        os.makedirs(self.processed_dir, exist_ok=True)
+        os.makedirs(self.raw_dir)
+        os.makedirs(self.processed_dir)
         
         # Define paths for test files
         self.raw_data_path = os.path.join(self.raw_dir, "test_raw_data.csv")
         self.processed_data_path = os.path.join(self.processed_dir, "test_processed_data.csv")
         
-        # Create a sample raw data file to be used by the tests
-        sample_data = {
-            "Date": pd.to_datetime(["2023-01-01", "2023-01-02", "2023-01-01", "2023-01-02"]),
-            "Ticker": ["AAPL", "AAPL", "GOOG", "GOOG"],
-            "Open": [100, 110, 2000, 2020],
-            "Close": [110, 108, 2025, 2015]
-        }
-        pd.DataFrame(sample_data).to_csv(self.raw_data_path, index=False)
-
-    def tearDown(self):
-        """
-        This method runs AFTER each test.
-        It completely removes the temporary directory and all its contents.
-        """
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
+        # Tests may delete or overwrite the raw file, so each one works on a copy
+        shutil.copyfile(self.sample_data_path, self.raw_data_path)
 
     def test_successful_processing(self):
         """Test the successful processing of a valid multi-ticker data file."""
@@ -73,8 +97,8 @@ class TestProcessDataSafely(unittest.TestCase):
 
     def test_returns_none_if_ticker_column_missing(self):
         """Test that the function returns None if the 'Ticker' column is missing."""
-        bad_df = pd.DataFrame({"Date": ["2023-01-01"], "Open": [100]})
-        bad_df.to_csv(self.raw_data_path, index=False, mode='w')
+        with open(self.raw_data_path, 'w') as f:
+            f.write("Date,Open\n2023-01-01,100\n")
         
         processed_df = process_data(self.raw_data_path, self.processed_data_path)
         self.assertIsNone(processed_df)
@@ -0,0 +1,70 @@
+import unittest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import tempfile
+from sklearn.model_selection import TimeSeriesSplit
+
+# Add the project root to the Python path
+# This allows us to import modules from the 'src' directory
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.train.split_data import last_split_cut, time_series_split
+
+class TestTimeSeriesSplit(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary directory for the split files."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.processed_data_path = os.path.join(self.temp_dir.name, 'processed_data.csv')
+
+    def tearDown(self):
+        """Remove the temporary directory and the split files."""
+        self.temp_dir.cleanup()
+
+    def test_cut_matches_last_time_series_split(self):
+        """The computed cut should reproduce the last fold of TimeSeriesSplit."""
+        for n_samples in [5, 10, 99, 100, 101, 1234]:
+            train_index, test_index = list(TimeSeriesSplit(n_splits=4).split(np.zeros(n_samples)))[-1]
+            cut = last_split_cut(n_samples, n_splits=4)
+            np.testing.assert_array_equal(train_index, np.arange(cut))
+            np.testing.assert_array_equal(test_index, np.arange(cut, n_samples))
+
+    def test_split_files(self):
+        """Test that the split files hold the earlier rows for training and the later rows for testing."""
+        num_days = 103
+        df = pd.DataFrame({
+            'Date': pd.date_range(start='2023-01-01', periods=num_days, freq='D'),
+            'Close': np.arange(num_days, dtype=float),
+            'y': np.arange(num_days) % 2
+        })
+        # Shuffle the rows, the split should sort them by date
+        df.sample(frac=1, random_state=0).to_csv(self.processed_data_path, index=False)
+
+        time_series_split(self.processed_data_path)
+
+        train_df = pd.read_csv(os.path.join(self.temp_dir.name, 'train_data.csv'))
+        test_df = pd.read_csv(os.path.join(self.temp_dir.name, 'test_data.csv'))
+        cut = last_split_cut(num_days, n_splits=4)
+        self.assertEqual(train_df['Close'].tolist(), list(range(cut)))
+        self.assertEqual(test_df['Close'].tolist(), list(range(cut, num_days)))
+
+    def test_split_in_memory(self):
+        """Test that the split frames are returned and no files are written when write_files is False."""
+        num_days = 103
+        pd.DataFrame({
+            'Date': pd.date_range(start='2023-01-01', periods=num_days, freq='D'),
+            'Close': np.arange(num_days, dtype=float),
+        }).to_csv(self.processed_data_path, index=False)
+
+        train_df, test_df = time_series_split(self.processed_data_path, write_files=False)
+
+        cut = last_split_cut(num_days, n_splits=4)
+        self.assertEqual(train_df['Close'].tolist(), list(range(cut)))
+        self.assertEqual(test_df['Close'].tolist(), list(range(cut, num_days)))
+        self.assertEqual(os.listdir(self.temp_dir.name), ['processed_data.csv'])
+
+if __name__ == '__main__':
+    unittest.main()
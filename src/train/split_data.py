@@ -1,47 +1,70 @@
-import pandas as pd
-from sklearn.model_selection import TimeSeriesSplit
 import os 
+import sys
 
-def time_series_split(processed_data_path: str):
+if __name__ == "__main__": #run as a script, put the project root on the path so src can be imported
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+try:
+    from ..data_pipeline.file_io import read_frame, write_frame
+except ImportError: #run as a script
+    from src.data_pipeline.file_io import read_frame, write_frame
+
+def last_split_cut(n_samples: int, n_splits: int) -> int:
+    """
+    returns the row where the last split of TimeSeriesSplit(n_splits) starts testing.
+    TimeSeriesSplit's test folds are n_samples // (n_splits + 1) rows long and the last
+    one ends at the final row, training is every row before it.
+    """
+    return n_samples - n_samples // (n_splits + 1)
+
+def time_series_split(processed_data_path: str, write_files: bool = True):
     """
     splits data frame into trainign and testing sets.
     split each year by : 9 months trainign , 3 months testing
     this leads to a 75% training split and 25% testing split.
     
-    creates two new csv files: 
-    -train_data.csv
-    -test_data.csv
+    if write_files is True, creates two new files, in the same format (.parquet or .csv) as the processed data: 
+    -train_data
+    -test_data
+
+    returns (train_df, test_df), so they can be passed straight to train_model
+    without writing the files and reading them back.
     """ 
     
-    df = pd.read_csv(processed_data_path, parse_dates= ['Date'], index_col= 'Date')
+    df = read_frame(processed_data_path).set_index('Date') #.parquet or .csv, chosen by the extension
     df.sort_index(inplace=True)
 
     #for a single 75/25 split, n_splits=4 means, 
     # last split will use the first 3 chunks for training, and the 4th chunk for testing. 
-    tscv = TimeSeriesSplit(n_splits=4)
+    #we only need the last split of TimeSeriesSplit(n_splits=4), so its boundary is computed
+    #directly instead of generating the index arrays of every split
+    cut = last_split_cut(len(df), n_splits=4)
 
-    #we only need the last split for testing
-    train_index, test_index = list(tscv.split(df))[-1] #this is the last split, which is the testing set
+    train_df = df.iloc[:cut]
+    test_df = df.iloc[cut:] #this is the last split, which is the testing set
 
-    train_df = df.iloc[train_index]
-    test_df = df.iloc[test_index]
+    print("Data split into training and testing sets successfully.")
+    print(f"Training data has {len(train_df)} rows.")
+    print(f"Testing data has {len(test_df)} rows.")
+
+    if not write_files:
+        return train_df, test_df
 
     output_dir = os.path.dirname(processed_data_path)
-    train_data_path = os.path.join(output_dir, 'train_data.csv')
-    test_data_path = os.path.join(output_dir, 'test_data.csv')
+    extension = os.path.splitext(processed_data_path)[1]
+    train_data_path = os.path.join(output_dir, 'train_data' + extension)
+    test_data_path = os.path.join(output_dir, 'test_data' + extension)
 
-    train_df.to_csv(train_data_path, index=False)
-    test_df.to_csv(test_data_path, index=False)
+    write_frame(train_df, train_data_path)
+    write_frame(test_df, test_data_path)
 
-    print("Data split into training and testing sets and saved successfully.")
-    print(f"Training data has {len(train_df)} rows.")
-    print(f"Testing data has {len(test_df)} rows.")
     print(f"Training data saved to {train_data_path}")
     print(f"Testing data saved to {test_data_path}")
+    return train_df, test_df
 
 if __name__ == "__main__":
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))    
-    data_path = os.path.join(project_root, 'data', 'Processed', 'processed_data.csv')
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    data_path = os.path.join(project_root, 'data', 'Processed', 'processed_data.parquet')
     
     if os.path.exists(data_path):
         time_series_split(data_path)
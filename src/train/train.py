@@ -20,7 +20,7 @@ step 3:  initalize XGboost classifier
 4: 
 - train the model with early stopping to prevent overfitting
 - the model is trianged by calling the 'fit' method on the traingin data (x_train and y_train)
-- Early stopping: This is a key technique to prevent overfitting. The models performance is monitored on the test set (eval_    
+- Early stopping: This is a key technique to prevent overfitting. The models performance is monitored on a validation set, the latest rows of the training data (eval_    
 - contd. stopping_rounds = 50, the training stops automatically, ensuring we get the best version of the model without it memoriziing the training data
 
 """
@@ -33,14 +33,58 @@ step 3:  initalize XGboost classifier
 import pandas as pd
 import xgboost as xgb
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import RandomizedSearchCV, TimeSeriesSplit
 import joblib
 import os
-def train_model(train_data_path:str, test_data_path: str, model_save_path: str):
+import pickle
+import shutil
+import sys
+
+if __name__ == "__main__": #run as a script, put the project root on the path so src can be imported
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+try:
+    from ..data_pipeline.file_io import read_columns, read_frame
+    from .split_data import last_split_cut, time_series_split
+except ImportError: #run as a script
+    from src.data_pipeline.file_io import read_columns, read_frame
+    from src.train.split_data import last_split_cut, time_series_split
+
+#identifier columns, not predictive so they are never loaded
+NON_PREDICTIVE_COLS = ['Date', 'Ticker']
+#seed for the hyperparameter search, so the same data always picks the same model
+RANDOM_STATE = 42
+
+def read_model_data(data_path: str) -> pd.DataFrame:
+    """
+    reads a train/test .parquet or .csv file, skipping the identifier columns
+    instead of loading them and dropping them later.
+    csv files are parsed with pyarrow's multithreaded parser.
+    """
+    columns = [col for col in read_columns(data_path) if col not in NON_PREDICTIVE_COLS]
+    return read_frame(data_path, columns=columns)
+
+def get_xgb_device() -> str:
+    """
+    returns 'cuda' when xgboost was built with cuda and an nvidia gpu driver is installed,
+    so the histograms are built on the gpu. otherwise returns 'cpu'.
+    """
+    if xgb.build_info().get('USE_CUDA') and shutil.which('nvidia-smi'):
+        return 'cuda'
+    return 'cpu'
+
+def train_model(train_data, test_data, model_save_path: str):
+    """
+    train_data / test_data: paths to the train/test .parquet or .csv files, or the
+    DataFrames themselves (e.g. returned by split_data.time_series_split), which are
+    used as they are instead of being read from disk.
+    """
     #step 1: load data
     try:
-        train_data = pd.read_csv(train_data_path)
-        test_data = pd.read_csv(test_data_path)
+        if not isinstance(train_data, pd.DataFrame):
+            train_data = read_model_data(train_data)
+        if not isinstance(test_data, pd.DataFrame):
+            test_data = read_model_data(test_data)
     except Exception as e:
         print(f"Error loading data: {e}")
         return
@@ -55,10 +99,12 @@ def train_model(train_data_path:str, test_data_path: str, model_save_path: str):
     features_to_drop = ['Date', 'Ticker', target_col]
     
 
-    x_train = train_data.drop(columns = features_to_drop, errors='ignore')
+    #features are cast to float32 once here, xgboost builds its histograms in float32 anyway,
+    #so this halves the memory it reads without changing the model
+    x_train = train_data.drop(columns = features_to_drop, errors='ignore').astype('float32')
     y_train = train_data[target_col]
 
-    x_test = test_data.drop(columns = features_to_drop, errors='ignore')
+    x_test = test_data.drop(columns = features_to_drop, errors='ignore').astype('float32')
     y_test = test_data[target_col]
 
 
@@ -68,12 +114,28 @@ def train_model(train_data_path:str, test_data_path: str, model_save_path: str):
     print(f"X_test shape :{x_test.shape}")
     print(f"y_test shape :{y_test.shape}")
 
+    # Hold out the latest rows of the training data as a validation set for early stopping.
+    # The test set is only used for the evaluation in step 4, so the hyperparameters and the
+    # number of trees aren't picked on the same rows the model is scored on.
+    cut = last_split_cut(len(x_train), n_splits=4)
+    x_fit, y_fit = x_train.iloc[:cut], y_train.iloc[:cut]
+    x_val, y_val = x_train.iloc[cut:], y_train.iloc[cut:]
+    print(f"Early stopping validation rows :{len(x_val)}")
+
     # Calculate scale_pos_weight for handling class imbalance
     # This is a common technique to help the model pay more attention to the minority class.
-    scale_pos_weight = y_train.value_counts()[0] / y_train.value_counts()[1]
+    # y is 0/1, so its sum is the number of positives. Falls back to 1 (no weighting) if there are none.
+    pos = int(y_train.to_numpy().sum())
+    neg = len(y_train) - pos
+    scale_pos_weight = neg / pos if pos else 1.0
     print(f"\nScale Pos Weight: {scale_pos_weight:.2f}")
 
     #step 3: initialize model with hyper parameters
+    device = get_xgb_device()
+    print(f"Training on: {device}")
+    # on the gpu the candidates run one after the other, each parallel worker would open its own
+    # cuda context on the same gpu and compete for its memory
+    search_jobs = 1 if device == 'cuda' else os.cpu_count()
     xgb_model = xgb.XGBClassifier(
         objective = 'binary:logistic',
         n_estimators = 1000,
@@ -82,11 +144,16 @@ def train_model(train_data_path:str, test_data_path: str, model_save_path: str):
         colsample_bytree = 0.8,
         use_label_encoder = False,
         eval_metric = 'logloss',
-        scale_pos_weight=scale_pos_weight
+        scale_pos_weight=scale_pos_weight,
+        tree_method = 'hist', # histogram split finding, much faster than exact on this many rows
+        device = device, # 'cuda' runs the histogram building on the gpu when there is one
+        max_bin = 256,
+        early_stopping_rounds = 50, # stop adding trees once the validation logloss stops improving
+        n_jobs = 1 # one thread per candidate, the search runs the candidates in parallel instead
     )
     
-    # Hyperparameter Tuning with GridSearchCV
-    print("\nStarting hyperparameter tuning with GridSearchCV...")
+    # Hyperparameter Tuning with RandomizedSearchCV
+    print("\nStarting hyperparameter tuning with RandomizedSearchCV...")
 
     param_grid = {
         'max_depth': [3, 5, 7],
@@ -95,25 +162,30 @@ def train_model(train_data_path:str, test_data_path: str, model_save_path: str):
         'subsample': [0.7, 0.8]
     }
 
-    # Set up GridSearchCV
+    # Set up RandomizedSearchCV, sampling n_iter cells of the grid instead of trying all of them
     # We are optimizing for 'precision' for the positive class (Up)
-    grid_search = GridSearchCV(
+    grid_search = RandomizedSearchCV(
         estimator=xgb_model,
-        param_grid=param_grid,
+        param_distributions=param_grid,
+        n_iter=8,
+        random_state=RANDOM_STATE, # same sampled candidates on every run
         scoring='precision',
-        n_jobs=-1,  # Use all available CPU cores
-        cv=3,       # 3-fold cross-validation
+        n_jobs=search_jobs,  # on cpu, one single-threaded fit per core, so the cores aren't oversubscribed
+        cv=TimeSeriesSplit(n_splits=3), # 3 folds, each trained only on data before its validation fold
+        refit=False, # the best model is fit once below, with every core
         verbose=2
     )
 
-    # Fit the grid search to the data
-    grid_search.fit(x_train, y_train)
+    # Fit the search to the data, monitoring the validation set for early stopping
+    grid_search.fit(x_fit, y_fit, eval_set=[(x_val, y_val)], verbose=False)
 
-    print("\nGrid search complete.")
+    print("\nHyperparameter search complete.")
     print(f"Best parameters found: {grid_search.best_params_}")
     
-    # Get the best model from the grid search
-    best_model = grid_search.best_estimator_
+    # Fit the best model, again early stopping on the validation set. The search only fit clones,
+    # so xgb_model is still unfitted and can take the best parameters, now using all cores for one model
+    best_model = xgb_model.set_params(**grid_search.best_params_, n_jobs=os.cpu_count())
+    best_model.fit(x_fit, y_fit, eval_set=[(x_val, y_val)], verbose=False)
 
 
 
@@ -140,19 +212,22 @@ def train_model(train_data_path:str, test_data_path: str, model_save_path: str):
     #step 5: save the model 
     print(f"\nSaving model to {model_save_path}...")
     try:
-        joblib.dump(best_model, model_save_path)
+        #newest pickle protocol (5) and no compression, the model is a local file so it isn't worth the cpu time
+        joblib.dump(best_model, model_save_path, protocol=pickle.HIGHEST_PROTOCOL, compress=0)
         print("Model saved successfully.")
     except Exception as e:
         print(f"Error saving model: {e}")
 if __name__ == "__main__":
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-    TRAIN_DATA_PATH = os.path.join(project_root, 'data', 'Processed', 'train_data.csv')
-    TEST_DATA_PATH = os.path.join(project_root, 'data', 'Processed', 'test_data.csv')
+    PROCESSED_DATA_PATH = os.path.join(project_root, 'data', 'Processed', 'processed_data.parquet')
     MODEL_SAVE_PATH = os.path.join(project_root, 'data', 'model.joblib')
 
     # Create directory for the model if it doesn't exist
     os.makedirs(os.path.dirname(MODEL_SAVE_PATH), exist_ok=True)
 
-    train_model(TRAIN_DATA_PATH, TEST_DATA_PATH, MODEL_SAVE_PATH)
-
-
+    if os.path.exists(PROCESSED_DATA_PATH):
+        #split in memory and hand the frames straight to training, no train/test files are written and read back
+        train_df, test_df = time_series_split(PROCESSED_DATA_PATH, write_files=False)
+        train_model(train_df, test_df, MODEL_SAVE_PATH)
+    else:
+        print(f"Error: Data file not found at {PROCESSED_DATA_PATH}")